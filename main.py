@@ -7,7 +7,9 @@ https://en.wikipedia.org/wiki/Conway%27s_Game_of_Life#Rules
 import os.path
 import time
 import json
+import random
 import tkinter as tk
+from itertools import chain, islice
 from tkinter import filedialog
 from typing import List
 
@@ -38,6 +40,15 @@ FIELD_OFFSET_X = (SCREEN_WIDTH - FIELD_WIDTH) / 2
 # ----- Epsilon value for floating-point comparison -----
 EPS = 10e-3
 
+# ----- Bits of precision used to approximate random fill density -----
+DENSITY_PRECISION = 16
+
+# ----- Cell values for every byte of random bits, most significant bit first -----
+BYTE_CELLS = [tuple(bool(byte >> (7 - i) & 1) for i in range(8)) for byte in range(256)]
+
+# ----- Field editing tools -----
+EDIT_TOOLS = ["toggle", "stamp", "fill", "random"]
+
 class CellularAutomata:
     """
     Cellular automata class.
@@ -99,6 +110,17 @@ class CellularAutomata:
         self.cell_width = FIELD_WIDTH / self.params.field_size
 
         self.update_screen = True
+        # Whole field has to be redrawn, otherwise only dirty region is redrawn
+        self.redraw_field = True
+        # Bounding box (left, top, right, bottom) of edited cells to redraw
+        self.dirty_region = None
+
+        # Field editing state
+        self.edit_tool = "toggle"
+        self.pattern = None
+        self.random_density = 0.5
+        self.drag_start = None
+        self.drag_button = None
 
     def main(self):
         """ Provides main pygame running loop """
@@ -125,18 +147,45 @@ class CellularAutomata:
                 self.running = False
                 continue
 
+            if event.type == pygame.KEYDOWN:
+                self.on_key(event.key)
+
             if event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = pygame.mouse.get_pos()
-                x -= FIELD_OFFSET_X
-                if x <= FIELD_WIDTH and y <= FIELD_WIDTH:
-                    cell_width = FIELD_WIDTH / self.params.field_size
-                    row = int(x // cell_width)
-                    column = int(y // cell_width)
-                    self.field[column][row] = not self.field[column][row]
-                    self.update_screen = True
+                cell = self.get_cell(event.pos)
+                if cell is not None:
+                    x, y = cell
+                    if self.edit_tool == "toggle":
+                        self.field[y][x] = not self.field[y][x]
+                        self.mark_dirty(x, y, 1, 1)
+                    elif self.edit_tool == "stamp" and self.pattern is not None:
+                        # Left button stamps pattern, right one clears its footprint
+                        if event.button == 1:
+                            self.stamp(self.pattern, x, y)
+                        elif event.button == 3:
+                            self.fill_rect(x, y, len(self.pattern[0]), len(self.pattern), False)
+                    elif self.edit_tool in ("fill", "random") and event.button in (1, 3):
+                        self.drag_start = cell
+                        self.drag_button = event.button
+
+            if (event.type == pygame.MOUSEBUTTONUP and self.drag_start is not None
+                    and event.button == self.drag_button):
+                cell = self.get_cell(event.pos, clamp=True)
+                x = min(cell[0], self.drag_start[0])
+                y = min(cell[1], self.drag_start[1])
+                width = abs(cell[0] - self.drag_start[0]) + 1
+                height = abs(cell[1] - self.drag_start[1]) + 1
+                # Left button brings cells to life, right one clears them
+                if event.button == 3:
+                    self.fill_rect(x, y, width, height, False)
+                elif self.edit_tool == "fill":
+                    self.fill_rect(x, y, width, height, True)
+                else:
+                    self.random_fill(x, y, width, height, self.random_density)
+                self.drag_start = None
+                self.drag_button = None
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = event.pos
                 for button in self.buttons:
                     real_rects = pygame.Rect(
                         PANEL_X + button.rect.left,
@@ -147,6 +196,17 @@ class CellularAutomata:
                     if real_rects.collidepoint(mouse_pos):
                         button.callback()
 
+    def on_key(self, key):
+        """ Keyboard callback: R/F rotate/flip stamp pattern, +/- change random fill density """
+        if key == pygame.K_r and self.pattern is not None:
+            self.pattern = self.transform_pattern(self.pattern, rotation=90)
+        if key == pygame.K_f and self.pattern is not None:
+            self.pattern = self.transform_pattern(self.pattern, flip=True)
+        if key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.on_denser()
+        if key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.on_sparser()
+
     def update(self):
         """ Provides update of pygame screen state with given rate """
         if not self.prev_update:
@@ -187,6 +247,7 @@ class CellularAutomata:
                     continue
 
         self.field = new_field
+        self.redraw_field = True
         self.update_screen = True
 
     def set_params(self, grid_size: int, birth_param: List[int], survive_param: List[int]):
@@ -225,6 +286,139 @@ class CellularAutomata:
         ]
         return sum(neighbour_cells)
 
+    def get_cell(self, pos, clamp=False):
+        """
+        Returns (x, y) field cell under screen position or None if it is outside the field.
+        With clamp positions outside the field are moved to the nearest edge cell.
+        """
+        x, y = pos
+        x -= FIELD_OFFSET_X
+        if not clamp and (x < 0 or y < 0 or x >= FIELD_WIDTH or y >= FIELD_WIDTH):
+            return None
+        cell_width = FIELD_WIDTH / self.params.field_size
+        last = self.params.field_size - 1
+        return (min(max(int(x // cell_width), 0), last),
+                min(max(int(y // cell_width), 0), last))
+
+    def mark_dirty(self, x, y, width, height):
+        """ Extends region of the field that has to be redrawn on next draw call """
+        self.update_screen = True
+        if self.redraw_field:
+            # Whole field redraw is already pending
+            return
+        region = (x, y, x + width, y + height)
+        if self.dirty_region is not None:
+            left, top, right, bottom = self.dirty_region
+            region = (min(left, region[0]), min(top, region[1]),
+                      max(right, region[2]), max(bottom, region[3]))
+        self.dirty_region = region
+
+    def clip_rect(self, x, y, width, height):
+        """ Clips rectangle to field bounds, returns (left, top, right, bottom) or None if empty """
+        left, top = max(x, 0), max(y, 0)
+        right = min(x + width, len(self.field[0]) if self.field else 0)
+        bottom = min(y + height, len(self.field))
+        if left >= right or top >= bottom:
+            return None
+        return left, top, right, bottom
+
+    @staticmethod
+    def load_pattern(path_to_file):
+        """ Loads pattern saved in the same format as CA state """
+        with open(path_to_file) as f:
+            pattern = [[bool(cell) for cell in row] for row in json.loads(f.read())]
+        CellularAutomata.check_pattern(pattern)
+        return pattern
+
+    @staticmethod
+    def check_pattern(pattern):
+        """ Checks that pattern is a non-empty rectangle """
+        if not pattern or not pattern[0]:
+            raise ValueError("Pattern should not be empty")
+        for row in pattern:
+            if len(row) != len(pattern[0]):
+                raise ValueError("Pattern rows should have the same length")
+
+    @staticmethod
+    def transform_pattern(pattern, rotation=0, flip=False):
+        """ Returns pattern flipped horizontally and then rotated clockwise by given degrees """
+        if rotation % 90 != 0:
+            raise ValueError("Rotation should be a multiple of 90 degrees")
+        CellularAutomata.check_pattern(pattern)
+        if flip:
+            pattern = [row[::-1] for row in pattern]
+        for _ in range(rotation // 90 % 4):
+            pattern = [list(row) for row in zip(*pattern[::-1])]
+        return pattern
+
+    def stamp(self, pattern, x, y, rotation=0, flip=False):
+        """
+        Copies pattern into the field with its top left corner at (x, y).
+        Pattern is clipped by field bounds and overwrites covered cells.
+        """
+        pattern = self.transform_pattern(pattern, rotation, flip)
+        rect = self.clip_rect(x, y, len(pattern[0]), len(pattern))
+        if rect is None:
+            return
+        left, top, right, bottom = rect
+        for row, pattern_row in zip(self.field[top:bottom], pattern[top - y:bottom - y]):
+            row[left:right] = pattern_row[left - x:right - x]
+        self.mark_dirty(left, top, right - left, bottom - top)
+
+    def fill_rect(self, x, y, width, height, value=True):
+        """ Sets all cells of rectangle region to given value """
+        rect = self.clip_rect(x, y, width, height)
+        if rect is None:
+            return
+        left, top, right, bottom = rect
+        values = [bool(value)] * (right - left)
+        for row in self.field[top:bottom]:
+            row[left:right] = values
+        self.mark_dirty(left, top, right - left, bottom - top)
+
+    def random_fill(self, x, y, width, height, density=0.5, rng=None):
+        """
+        Fills rectangle region with random cells, each of them is alive with given probability.
+        Random bits for the whole region are generated at once and combined with AND/OR
+        according to binary expansion of density.
+        """
+        if density < 0 or density > 1:
+            raise ValueError("Density should be a value between 0 and 1")
+        rect = self.clip_rect(x, y, width, height)
+        if rect is None:
+            return
+        if rng is None:
+            rng = random
+        left, top, right, bottom = rect
+        row_width = right - left
+        # Every row starts at a whole byte, extra cells at row ends are dropped
+        row_bytes = -(-row_width // 8)
+        size = row_bytes * 8 * (bottom - top)
+
+        # Each processed bit of density halves probability and adds 1/2 to it if bit is set
+        numerator = round(density * (1 << DENSITY_PRECISION))
+        if numerator >> DENSITY_PRECISION:
+            bits = (1 << size) - 1
+        else:
+            # Trailing zero bits would only AND random words into zero
+            precision = DENSITY_PRECISION
+            while numerator and not numerator & 1:
+                numerator >>= 1
+                precision -= 1
+            bits = 0
+            for _ in range(precision if numerator else 0):
+                word = rng.getrandbits(size)
+                bits = bits | word if numerator & 1 else bits & word
+                numerator >>= 1
+
+        data = bits.to_bytes(size // 8, "big")
+        for i, row in enumerate(self.field[top:bottom]):
+            row_data = data[i * row_bytes:(i + 1) * row_bytes]
+            row[left:right] = islice(
+                chain.from_iterable(map(BYTE_CELLS.__getitem__, row_data)), row_width
+            )
+        self.mark_dirty(left, top, row_width, bottom - top)
+
     def init_draw(self, screen):
         screen.fill((255, 255, 255))
         for y, row in enumerate(self.field):
@@ -242,8 +436,19 @@ class CellularAutomata:
 
         self.update_screen = False
 
-        for y, row in enumerate(self.field):
-            for x, cell in enumerate(row):
+        # Redraw only cells changed by edits if nothing else happened since last draw
+        if self.redraw_field:
+            left, top = 0, 0
+            right, bottom = len(self.field[0]) if self.field else 0, len(self.field)
+        elif self.dirty_region is not None:
+            left, top, right, bottom = self.dirty_region
+        else:
+            left, top, right, bottom = 0, 0, 0, 0
+        self.redraw_field = False
+        self.dirty_region = None
+
+        for y, row in enumerate(self.field[top:bottom], top):
+            for x, cell in enumerate(row[left:right], left):
                 border_width = 1
                 rect = pygame.Rect(FIELD_OFFSET_X + x * self.cell_width + border_width,
                                    y * self.cell_width + border_width,
@@ -324,6 +529,25 @@ class CellularAutomata:
                 text="reset",
                 f=self.on_reset
             ),
+            Button(
+                position=(
+                    CONTROL_PANE_WIDTH / 2 - button_width / 2 - 2 * spacing,
+                    3 * CONTROL_PANE_HEIGHT / 4 - 20
+                ),
+                size=(button_width, button_height),
+                text=self.edit_tool if self.edit_tool != "random"
+                else f"random {self.random_density:.1f}",
+                f=self.on_switch_tool
+            ),
+            Button(
+                position=(
+                    CONTROL_PANE_WIDTH / 2 - button_width / 2 + 2 * spacing,
+                    3 * CONTROL_PANE_HEIGHT / 4 - 20
+                ),
+                size=(button_width, button_height),
+                text="pattern",
+                f=self.on_pattern
+            ),
 
         ]
 
@@ -352,6 +576,7 @@ class CellularAutomata:
         else:
             with open(path_to_file) as f:
                 self.field = json.loads(f.read())
+        self.redraw_field = True
         self.update_screen = True
 
     def on_save(self, path_to_file=None):
@@ -366,6 +591,35 @@ class CellularAutomata:
             with open(path_to_file, "w") as f:
                 f.write(json.dumps(self.field))
 
+    def on_switch_tool(self):
+        """ Tool button callback function """
+        self.edit_tool = EDIT_TOOLS[(EDIT_TOOLS.index(self.edit_tool) + 1) % len(EDIT_TOOLS)]
+        self.drag_start = None
+        self.drag_button = None
+        self.update_screen = True
+
+    def on_pattern(self, path_to_file=None):
+        """ Pattern button callback function, selects pattern for stamp tool """
+        if path_to_file is None:
+            path_to_file = filedialog.askopenfilename(
+                defaultextension=".txt",
+                filetypes=[("All Files", "*.*"), ("Text Documents", "*.txt")])
+            if not path_to_file:
+                return
+        self.pattern = self.load_pattern(path_to_file)
+        self.edit_tool = "stamp"
+        self.update_screen = True
+
+    def on_denser(self):
+        """ Increases density of random fill tool """
+        self.random_density = min(round(self.random_density + 0.1, 1), 1)
+        self.update_screen = True
+
+    def on_sparser(self):
+        """ Decreases density of random fill tool """
+        self.random_density = max(round(self.random_density - 0.1, 1), 0)
+        self.update_screen = True
+
     def on_slower(self):
         """ Slower button callback function """
         if abs(self.update_rate - 1) > EPS:
@@ -383,6 +637,7 @@ class CellularAutomata:
         ]
         self.moving = False
         self.update_rate = 0.5
+        self.redraw_field = True
         self.update_screen = True
 
 
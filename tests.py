@@ -1,7 +1,10 @@
 import os
+import random
 import unittest
 
-from main import CellularAutomata
+import pygame
+
+from main import CellularAutomata, FIELD_OFFSET_X, FIELD_WIDTH
 
 
 class OnStepTestCase(unittest.TestCase):
@@ -219,5 +222,265 @@ class OnSlowerTestCase(unittest.TestCase):
         assert abs(ca.update_rate - 1) < eps
 
 
+class StampTestCase(unittest.TestCase):
+    """ Test case for stamp method. """
+
+    glider = [
+        [False, True, False],
+        [False, False, True],
+        [True, True, True]
+    ]
+
+    def test_stamp(self):
+        """ Test stamping pattern at offset """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 5 for _ in range(5)]
+        ca.stamp(self.glider, 1, 1)
+        assert ca.field == [
+            [False, False, False, False, False],
+            [False, False, True, False, False],
+            [False, False, False, True, False],
+            [False, True, True, True, False],
+            [False, False, False, False, False]
+        ]
+
+    def test_stamp_rotated_flipped(self):
+        """ Test stamping flipped and rotated pattern """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 3 for _ in range(3)]
+        ca.stamp(self.glider, 0, 0, rotation=90, flip=True)
+        assert ca.field == [
+            [True, True, False],
+            [True, False, True],
+            [True, False, False]
+        ]
+
+    def test_stamp_clipped(self):
+        """ Test stamping pattern partially outside of the field """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 3 for _ in range(3)]
+        ca.stamp(self.glider, -1, 1)
+        assert ca.field == [
+            [False, False, False],
+            [True, False, False],
+            [False, True, False]
+        ]
+
+    def test_uneven_pattern(self):
+        """ Attempt to stamp pattern with rows of different length """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 5 for _ in range(5)]
+        with self.assertRaises(ValueError):
+            ca.stamp([[True, True, True], [True]], 0, 0)
+        assert [len(row) for row in ca.field] == [5] * 5
+
+    def test_load_uneven_pattern(self):
+        """ Attempt to load pattern with rows of different length """
+
+        path = './test_resources/uneven_pattern.txt'
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[[true, true, true], [true]]")
+        try:
+            with self.assertRaises(ValueError):
+                CellularAutomata.load_pattern(path)
+        finally:
+            os.remove(path)
+
+    def test_invalid_rotation(self):
+        """ Attempt to rotate pattern by angle not multiple of 90 degrees """
+
+        ca = CellularAutomata()
+        with self.assertRaises(ValueError):
+            ca.stamp(self.glider, 0, 0, rotation=45)
+
+
+class FillRectTestCase(unittest.TestCase):
+    """ Test case for fill_rect method. """
+
+    def test_fill_rect(self):
+        """ Test filling rectangle clipped by field bounds """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 4 for _ in range(3)]
+        ca.fill_rect(2, 1, 5, 5)
+        assert ca.field == [
+            [False, False, False, False],
+            [False, False, True, True],
+            [False, False, True, True]
+        ]
+        ca.fill_rect(3, 0, 1, 3, False)
+        assert ca.field == [
+            [False, False, False, False],
+            [False, False, True, False],
+            [False, False, True, False]
+        ]
+
+    def test_dirty_region(self):
+        """ Test that edits extend region to redraw """
+
+        ca = CellularAutomata()
+        ca.update_screen = False
+        ca.redraw_field = False
+        ca.fill_rect(1, 2, 3, 4)
+        ca.fill_rect(5, 0, 1, 1)
+        assert ca.update_screen
+        assert ca.dirty_region == (1, 0, 6, 6)
+
+
+class RedrawTestCase(unittest.TestCase):
+    """ Test case for field redraw tracking. """
+
+    def test_panel_callbacks(self):
+        """ Test that panel only callbacks do not request whole field redraw """
+
+        ca = CellularAutomata()
+        ca.redraw_field = False
+        ca.on_switch_tool()
+        ca.on_switch_mode()
+        ca.fill_rect(0, 0, 2, 2)
+        assert ca.update_screen
+        assert not ca.redraw_field
+        assert ca.dirty_region == (0, 0, 2, 2)
+
+    def test_step(self):
+        """ Test that evolution step requests whole field redraw """
+
+        ca = CellularAutomata()
+        ca.redraw_field = False
+        ca.on_step()
+        assert ca.redraw_field
+
+
+class RandomFillTestCase(unittest.TestCase):
+    """ Test case for random_fill method. """
+
+    def test_random_fill_density(self):
+        """ Test that share of alive cells matches density """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 200 for _ in range(200)]
+        ca.random_fill(0, 0, 200, 100, 0.3, random.Random(0))
+        alive = sum(map(sum, ca.field[:100]))
+        assert abs(alive / 20000 - 0.3) < 0.02
+        assert not any(map(any, ca.field[100:]))
+        assert [len(row) for row in ca.field] == [200] * 200
+
+    def test_random_fill_uneven_width(self):
+        """ Test filling region whose width is not a multiple of 8 """
+
+        ca = CellularAutomata()
+        ca.field = [[False] * 12 for _ in range(4)]
+        ca.random_fill(1, 1, 10, 2, 1)
+        assert [len(row) for row in ca.field] == [12] * 4
+        assert sum(map(sum, ca.field)) == 20
+        assert all(ca.field[1][1:11]) and all(ca.field[2][1:11])
+
+    def test_random_fill_bounds(self):
+        """ Test filling with zero and full density """
+
+        ca = CellularAutomata()
+        ca.field = [[True] * 5 for _ in range(5)]
+        ca.random_fill(0, 0, 5, 5, 0)
+        assert not any(map(any, ca.field))
+        ca.random_fill(0, 0, 5, 5, 1)
+        assert all(map(all, ca.field))
+
+    def test_invalid_density(self):
+        """ Attempt to fill region with density out of [0, 1] """
+
+        ca = CellularAutomata()
+        with self.assertRaises(ValueError):
+            ca.random_fill(0, 0, 5, 5, 1.5)
+
+
+class GetInputTestCase(unittest.TestCase):
+    """ Test case for drag editing in get_input method. """
+
+    @staticmethod
+    def cell_pos(x, y):
+        """ Screen position of the center of field cell """
+        cell_width = FIELD_WIDTH / CellularAutomata.Params().field_size
+        return FIELD_OFFSET_X + (x + .5) * cell_width, (y + .5) * cell_width
+
+    def test_drag_in_one_batch(self):
+        """ Test fill drag whose press and release are handled together """
+
+        ca = CellularAutomata()
+        ca.edit_tool = "fill"
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=self.cell_pos(0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=self.cell_pos(4, 4))
+        ])
+        assert sum(map(sum, ca.field)) == 25
+        assert all(all(row[:5]) for row in ca.field[:5])
+
+    def test_drag_other_button_release(self):
+        """ Test that releasing other button does not finish drag """
+
+        ca = CellularAutomata()
+        ca.edit_tool = "fill"
+        ca.field[1][1] = True
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=3, pos=self.cell_pos(0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=4, pos=self.cell_pos(2, 2)),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=self.cell_pos(2, 2))
+        ])
+        assert ca.field[1][1]
+        assert ca.drag_start == (0, 0)
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=3, pos=self.cell_pos(2, 2))
+        ])
+        assert not any(map(any, ca.field))
+        assert ca.drag_start is None
+
+    def test_stamp_buttons(self):
+        """ Test that only left click stamps and right click clears pattern footprint """
+
+        ca = CellularAutomata()
+        ca.edit_tool = "stamp"
+        ca.pattern = [[True, True], [True, True]]
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=4, pos=self.cell_pos(0, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=5, pos=self.cell_pos(0, 0))
+        ])
+        assert not any(map(any, ca.field))
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=self.cell_pos(0, 0))
+        ])
+        assert sum(map(sum, ca.field)) == 4
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=3, pos=self.cell_pos(0, 0))
+        ])
+        assert not any(map(any, ca.field))
+
+    def test_density_keys(self):
+        """ Test changing random fill density with keys """
+
+        ca = CellularAutomata()
+        ca.get_input([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_EQUALS)])
+        assert abs(ca.random_density - 0.6) < 10e-3
+        for _ in range(10):
+            ca.get_input([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_MINUS)])
+        assert ca.random_density == 0
+
+    def test_drag_release_outside(self):
+        """ Test that release outside of the field is clamped to field edge """
+
+        ca = CellularAutomata()
+        ca.edit_tool = "fill"
+        size = ca.params.field_size
+        ca.get_input([
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=self.cell_pos(size - 2, 0)),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, button=1,
+                               pos=(FIELD_OFFSET_X + FIELD_WIDTH + 10, -10))
+        ])
+        assert sum(map(sum, ca.field)) == 2
+        assert ca.field[0][size - 2] and ca.field[0][size - 1]
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file